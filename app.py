@@ -4,21 +4,28 @@ import sqlite3
 from datetime import datetime, date, timezone
 from flask import (
     Flask, render_template, request, redirect, url_for, flash,
-    send_file, jsonify, abort
+    send_file, jsonify, abort, Response
 )
 from werkzeug.utils import secure_filename
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user, UserMixin
 import csv
 import io
 import hashlib
+import re
 import pandas as pd
 import traceback
+import threading
+import bisect
+from collections import Counter
+from array import array
+import reports
+import delivery
 
 # -------------------------
 # Configuration
 # -------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "students_erp.db")
+DB_PATH = os.environ.get("ERP_DB_PATH", os.path.join(BASE_DIR, "students_erp.db"))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 ALLOWED_EXT = {"png", "jpg", "jpeg"}
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -28,6 +35,8 @@ app.secret_key = "replace-with-secure-secret"  # change in production
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["MAX_CONTENT_LENGTH"] = 5 * 1024 * 1024  # 5MB
 
+delivery.init_app(app)
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "login"
@@ -43,6 +52,79 @@ def get_conn():
 def now_ts():
     return datetime.now(timezone.utc).isoformat()
 
+def students_version(cur=None):
+    """Counter bumped by triggers on every students write (see init_db)."""
+    if cur is not None:
+        return cur.execute("SELECT version FROM data_version WHERE name='students'").fetchone()[0]
+    conn = get_conn()
+    v = students_version(conn.cursor())
+    conn.close()
+    return v
+
+# columns added after the first release; init_db adds them to existing databases
+STUDENT_EXTRA_COLUMNS = [
+    ("section", "TEXT DEFAULT ''"),
+    ("gender", "TEXT"),
+    ("class_key", "TEXT"),
+    ("mobile_digits", "TEXT"),
+    ("aadhaar_digits", "TEXT"),
+]
+
+ROMAN_CLASSES = {
+    "I": "1", "II": "2", "III": "3", "IV": "4", "V": "5", "VI": "6",
+    "VII": "7", "VIII": "8", "IX": "9", "X": "10", "XI": "11", "XII": "12"
+}
+# longest numerals first so 'VIII' is not read as 'V' + section 'III'
+_ROMAN_RE = "|".join(sorted(ROMAN_CLASSES, key=len, reverse=True))
+_ORDINALS = ("ST", "ND", "RD", "TH")
+_CLASS_HEAD_RE = re.compile(rf"(?:0*(\d+)|({_ROMAN_RE}))(?:ST|ND|RD|TH)?([A-Z]?)")
+
+# bump when gender_of/class_key/mobile_digits change so init_db recomputes stored keys
+NORMALIZE_VERSION = 2
+
+def gender_of(sex_cast):
+    """Canonical gender ('M', 'F' or '') from the 'SEX / CAST' column, e.g. 'Male / OBC' -> 'M'."""
+    sex = (sex_cast or "").split("/")[0].strip().upper()
+    return sex[:1] if sex[:1] in ("M", "F") else ""
+
+def class_key(cls):
+    """
+    Canonical key for the admission_class text: 'Class V', 'Vth', '5 th' and '05'
+    all map to '5'. A section written into the class text stays part of the key
+    ('V-A', 'VA' and '5A' -> '5A'), so such classes remain separate rosters; the
+    separate section column is a sub-grouping within a class and is not read here.
+    Applying class_key to a key returns the same key.
+    """
+    tokens = re.findall(r"[A-Z0-9]+", (cls or "").upper())
+    if tokens and tokens[0] in ("CLASS", "STD", "STANDARD", "GRADE"):
+        tokens = tokens[1:]
+    if not tokens:
+        return ""
+    head, rest = tokens[0], tokens[1:]
+    if rest and rest[0] in _ORDINALS:
+        rest = rest[1:]
+    m = _CLASS_HEAD_RE.fullmatch(head)
+    if m:
+        number = str(int(m.group(1))) if m.group(1) else ROMAN_CLASSES[m.group(2)]
+        head = number + m.group(3)
+    return head + "".join(rest)
+
+def mobile_digits(mobile):
+    """Digits-only mobile number without the +91 / leading 0 prefix."""
+    digits = re.sub(r"\D", "", mobile or "")
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits
+
+def aadhaar_digits(aadhaar):
+    return re.sub(r"\D", "", aadhaar or "")
+
+def normalized_columns(sex_cast, admission_class, mobile_no, aadhaar_no):
+    """Values for the indexed (gender, class_key, mobile_digits, aadhaar_digits) columns."""
+    return (gender_of(sex_cast), class_key(admission_class), mobile_digits(mobile_no), aadhaar_digits(aadhaar_no))
+
 def init_db():
     conn = get_conn()
     cur = conn.cursor()
@@ -73,6 +155,7 @@ def init_db():
         mobile_no TEXT,
         admission_class TEXT,
         admission_no TEXT,
+        section TEXT DEFAULT '',
         blood_group TEXT,
         address TEXT,
         category TEXT,
@@ -84,6 +167,10 @@ def init_db():
         photo TEXT,
         remarks TEXT,
         status TEXT DEFAULT 'active',
+        gender TEXT,
+        class_key TEXT,
+        mobile_digits TEXT,
+        aadhaar_digits TEXT,
         created_at TEXT,
         updated_at TEXT
     )
@@ -135,6 +222,44 @@ def init_db():
     )
     """)
 
+    # bring databases created by older versions up to date
+    cur.execute("PRAGMA table_info(students)")
+    existing_cols = {r["name"] for r in cur.fetchall()}
+    for col, decl in STUDENT_EXTRA_COLUMNS:
+        if col not in existing_cols:
+            cur.execute(f"ALTER TABLE students ADD COLUMN {col} {decl}")
+
+    # fill the normalized lookup columns for rows written before they existed,
+    # or for every row when the normalization rules changed
+    stale = cur.execute("PRAGMA user_version").fetchone()[0] < NORMALIZE_VERSION
+    cur.execute("SELECT id,sex_cast,admission_class,mobile_no,aadhaar_no FROM students"
+                + ("" if stale else " WHERE gender IS NULL"))
+    backfill = [normalized_columns(r["sex_cast"], r["admission_class"], r["mobile_no"], r["aadhaar_no"]) + (r["id"],)
+                for r in cur.fetchall()]
+    if backfill:
+        cur.executemany("UPDATE students SET gender=?, class_key=?, mobile_digits=?, aadhaar_digits=? WHERE id=?", backfill)
+    cur.execute(f"PRAGMA user_version = {NORMALIZE_VERSION}")
+
+    # lookups go through class_key now
+    cur.execute("DROP INDEX IF EXISTS idx_students_class")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_gender ON students(gender)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_class_key ON students(class_key, student_name)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_mobile_digits ON students(mobile_digits)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_aadhaar_digits ON students(aadhaar_digits)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_dob ON students(dob)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_fees_student ON fees(student_id, year, month)")
+
+    # bumped by triggers on every student write; list pages derive their ETags from it
+    cur.execute("CREATE TABLE IF NOT EXISTS data_version (name TEXT PRIMARY KEY, version INTEGER DEFAULT 0)")
+    cur.execute("INSERT OR IGNORE INTO data_version (name, version) VALUES ('students', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS students_version_{event.lower()} AFTER {event} ON students
+        BEGIN
+            UPDATE data_version SET version = version + 1 WHERE name = 'students';
+        END
+        """)
+
     conn.commit()
 
     # create default admin if none
@@ -149,7 +274,10 @@ def init_db():
 
     conn.close()
 
-init_db()
+# On Windows the report pool starts workers by re-importing this script as
+# __mp_main__; they only render templates, so leave the database alone there.
+if __name__ != "__mp_main__":
+    init_db()
 
 # -------------------------
 # User
@@ -199,6 +327,117 @@ def record_audit(user, action, student_id=None, change_summary=""):
         except Exception:
             pass
 
+# -------------------------
+# Class roster index
+# -------------------------
+class ClassRosterIndex:
+    """
+    In-memory class_key -> roster of (id, name) sorted by name, plus the
+    admission_class text most students of each class carry (shown as the
+    class label), shared by the attendance, dashboard and bulk pages. Every
+    student is held with an active flag; rosters and counts cover only
+    status 'active', so inactive and transferred students drop out of roll
+    call and the chart but their classes stay reachable. Every read checks the students
+    data_version stamp, so writes from other workers trigger a one-pass
+    rebuild; writes made here are applied in place when the stamp shows no
+    one else wrote in between.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._rosters = {}   # class_key -> (sort keys, ids, names, active flags)
+        self._active = Counter()  # class_key -> number of active students
+        self._class_of = {}  # id -> class_key
+        self._labels = {}    # class_key -> Counter of admission_class texts
+        self._label_of = {}  # id -> admission_class text
+
+    def _rebuild(self, cur):
+        cur.execute("BEGIN")  # version and rows from the same snapshot
+        version = students_version(cur)
+        rows = sorted(((r[2] or "", (r[1] or "").casefold(), r[0], r[1] or "", r[3] or "", r[4] == "active")
+                       for r in cur.execute("SELECT id,student_name,class_key,admission_class,status FROM students")))
+        cur.execute("COMMIT")
+        rosters, class_of, labels, label_of, active_count = {}, {}, {}, {}, Counter()
+        for key, sort_key, sid, name, label, active in rows:
+            keys, ids, names, flags = rosters.setdefault(key, ([], array("q"), [], bytearray()))
+            keys.append((sort_key, sid))
+            ids.append(sid)
+            names.append(name)
+            flags.append(active)
+            active_count[key] += active
+            class_of[sid] = key
+            labels.setdefault(key, Counter())[label] += 1
+            label_of[sid] = label
+        self._rosters, self._class_of, self._version = rosters, class_of, version
+        self._labels, self._label_of, self._active = labels, label_of, active_count
+
+    def _current(self):
+        # caller holds the lock
+        conn = get_conn()
+        try:
+            if students_version(conn.cursor()) != self._version:
+                self._rebuild(conn.cursor())
+        finally:
+            conn.close()
+
+    def _remove(self, student_id):
+        key = self._class_of.pop(student_id, None)
+        if key is None:
+            return
+        keys, ids, names, flags = self._rosters[key]
+        i = ids.index(student_id)
+        self._active[key] -= flags[i]
+        del keys[i], ids[i], names[i], flags[i]
+        self._labels[key][self._label_of.pop(student_id)] -= 1
+        if not ids:
+            del self._rosters[key], self._labels[key], self._active[key]
+
+    def roster(self, cls):
+        """[(id, name), ...] of the active students in a class, sorted by name."""
+        with self._lock:
+            self._current()
+            _, ids, names, flags = self._rosters.get(class_key(cls), ((), (), (), ()))
+            return [(sid, name) for sid, name, active in zip(ids, names, flags) if active]
+
+    def classes(self, include_inactive=False):
+        """
+        [(class_key, label, active student count), ...] sorted by class. Classes
+        with no active students are left out unless include_inactive is set.
+        """
+        with self._lock:
+            self._current()
+            return sorted((key, self._labels[key].most_common(1)[0][0], self._active[key])
+                          for key in self._rosters if include_inactive or self._active[key])
+
+    def apply(self, new_version, student_id, name=None, cls=None, status="active", deleted=False):
+        """
+        Records a single-row write made on this worker. new_version is the stamp
+        read inside the writing transaction; unless it is exactly one step ahead
+        of ours, someone else wrote too and the next read rebuilds instead.
+        status is the value the row holds after the write.
+        """
+        with self._lock:
+            if self._version is None or new_version != self._version + 1:
+                self._version = None
+                return
+            self._remove(student_id)
+            if not deleted:
+                key = class_key(cls)
+                keys, ids, names, flags = self._rosters.setdefault(key, ([], array("q"), [], bytearray()))
+                entry = ((name or "").casefold(), student_id)
+                i = bisect.bisect(keys, entry)
+                keys.insert(i, entry)
+                ids.insert(i, student_id)
+                names.insert(i, name or "")
+                flags.insert(i, status == "active")
+                self._active[key] += status == "active"
+                self._class_of[student_id] = key
+                self._labels.setdefault(key, Counter())[cls or ""] += 1
+                self._label_of[student_id] = cls or ""
+            self._version = new_version
+
+roster_index = ClassRosterIndex()
+
 # -------------------------
 # Importer (reads the specific sheet with clean table)
 # -------------------------
@@ -291,6 +530,7 @@ def import_from_excel(filename="students.xlsx", sheet_name=None):
             admno = str(admno).strip()
 
             sid = stable_id(sch, admno or sl)
+            norm = normalized_columns(sex, cls, mobile, aadhaar)
 
             cur.execute("SELECT id FROM students WHERE stable_id=?", (sid,))
             existing = cur.fetchone()
@@ -300,17 +540,18 @@ def import_from_excel(filename="students.xlsx", sheet_name=None):
                 cur.execute("""
                     UPDATE students SET
                         school_id=?, sl_no=?, student_name=?, father_name=?, mother_name=?,
-                        sex_cast=?, dob=?, aadhaar_no=?, mobile_no=?, admission_class=?, admission_no=?, updated_at=?
+                        sex_cast=?, dob=?, aadhaar_no=?, mobile_no=?, admission_class=?, admission_no=?,
+                        gender=?, class_key=?, mobile_digits=?, aadhaar_digits=?, updated_at=?
                     WHERE stable_id=?
-                """, (sch, sl, name, father, mother, sex, dob, aadhaar, mobile, cls, admno, now, sid))
+                """, (sch, sl, name, father, mother, sex, dob, aadhaar, mobile, cls, admno, *norm, now, sid))
                 updated += 1
             else:
                 cur.execute("""INSERT INTO students (
                     stable_id, school_id, sl_no, student_name, father_name, mother_name,
                     sex_cast, dob, aadhaar_no, mobile_no, admission_class, admission_no,
-                    created_at, updated_at
-                ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                (sid, sch, sl, name, father, mother, sex, dob, aadhaar, mobile, cls, admno, now, now))
+                    gender, class_key, mobile_digits, aadhaar_digits, created_at, updated_at
+                ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+                (sid, sch, sl, name, father, mother, sex, dob, aadhaar, mobile, cls, admno, *norm, now, now))
                 inserted += 1
 
         conn.commit()
@@ -388,13 +629,12 @@ def dashboard():
     cur = conn.cursor()
     cur.execute("SELECT COUNT(*) FROM students WHERE status='active'")
     total = cur.fetchone()[0]
-    cur.execute("SELECT COUNT(*) FROM students WHERE sex_cast LIKE 'M%' OR sex_cast LIKE 'Male%'")
-    boys = cur.fetchone()[0]
-    cur.execute("SELECT COUNT(*) FROM students WHERE sex_cast LIKE 'F%' OR sex_cast LIKE 'Female%'")
-    girls = cur.fetchone()[0]
-    cur.execute("SELECT admission_class, COUNT(*) as c FROM students GROUP BY admission_class ORDER BY admission_class")
-    per_class = cur.fetchall()
+    cur.execute("SELECT gender, COUNT(*) FROM students WHERE gender IN ('M','F') GROUP BY gender")
+    by_gender = dict(cur.fetchall())
+    boys = by_gender.get("M", 0)
+    girls = by_gender.get("F", 0)
     conn.close()
+    per_class = [(label, count) for _, label, count in roster_index.classes()]
     return render_template("dashboard.html", total=total, boys=boys, girls=girls, per_class=per_class)
 
 @app.route("/search")
@@ -406,18 +646,30 @@ def search():
         "gender": request.args.get("gender", "").strip(),
         "status": request.args.get("status", "").strip()
     }
+    return delivery.conditional_page(
+        ("search", students_version(), current_user.id, request.query_string),
+        lambda: _render_search(q, filters))
+
+def _render_search(q, filters):
     conn = get_conn()
     cur = conn.cursor()
     where = []
     params = []
     if q:
         qlike = f"%{q}%"
-        where.append("(student_name LIKE ? OR father_name LIKE ? OR mother_name LIKE ? OR mobile_no LIKE ? OR admission_no LIKE ?)")
+        match = "student_name LIKE ? OR father_name LIKE ? OR mother_name LIKE ? OR mobile_no LIKE ? OR admission_no LIKE ?"
         params += [qlike] * 5
+        if re.fullmatch(r"[\d\s+-]+", q):
+            # full numbers typed with or without spaces/dashes hit the indexed digit columns
+            if len(mobile_digits(q)) == 10:
+                match += " OR mobile_digits = ?"; params.append(mobile_digits(q))
+            if len(aadhaar_digits(q)) == 12:
+                match += " OR aadhaar_digits = ?"; params.append(aadhaar_digits(q))
+        where.append(f"({match})")
     if filters["class"]:
-        where.append("admission_class = ?"); params.append(filters["class"])
+        where.append("class_key = ?"); params.append(class_key(filters["class"]))
     if filters["gender"]:
-        where.append("sex_cast LIKE ?"); params.append(filters["gender"] + "%")
+        where.append("gender = ?"); params.append(gender_of(filters["gender"]))
     if filters["status"]:
         where.append("status = ?"); params.append(filters["status"])
     sql = "SELECT id,student_name,father_name,admission_class,mobile_no FROM students"
@@ -450,17 +702,22 @@ def add_student():
         now = now_ts()
         cur.execute("""INSERT INTO students (
             stable_id, school_id, sl_no, student_name, father_name, mother_name,
-            sex_cast, dob, aadhaar_no, mobile_no, admission_class, admission_no,
+            sex_cast, dob, aadhaar_no, mobile_no, admission_class, admission_no, section,
             blood_group, address, category, religion, prev_school, transport_required,
-            medical_issues, emergency_contact, photo, remarks, status, created_at, updated_at
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+            medical_issues, emergency_contact, photo, remarks, status,
+            gender, class_key, mobile_digits, aadhaar_digits, created_at, updated_at
+        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
         (sid, form.get("school_id", ""), form.get("sl_no", ""), form.get("student_name", ""), form.get("father_name", ""), form.get("mother_name", ""),
-         form.get("sex_cast", ""), form.get("dob", ""), form.get("aadhaar_no", ""), form.get("mobile_no", ""), form.get("admission_class", ""), form.get("admission_no", ""),
+         form.get("sex_cast", ""), form.get("dob", ""), form.get("aadhaar_no", ""), form.get("mobile_no", ""), form.get("admission_class", ""), form.get("admission_no", ""), form.get("section", ""),
          form.get("blood_group", ""), form.get("address", ""), form.get("category", ""), form.get("religion", ""), form.get("prev_school", ""), 1 if form.get("transport_required") == "on" else 0,
-         form.get("medical_issues", ""), form.get("emergency_contact", ""), photo, "", form.get("status", "active"), now, now))
-        conn.commit()
+         form.get("medical_issues", ""), form.get("emergency_contact", ""), photo, "", form.get("status", "active"),
+         *normalized_columns(form.get("sex_cast", ""), form.get("admission_class", ""), form.get("mobile_no", ""), form.get("aadhaar_no", "")), now, now))
         new_id = cur.lastrowid
+        version = students_version(cur)
+        conn.commit()
         conn.close()
+        roster_index.apply(version, new_id, form.get("student_name", ""), form.get("admission_class", ""),
+                           form.get("status", "active"))
         record_audit(current_user.username, "CREATE", new_id, f"Created student {form.get('student_name')}")
         flash("Student added", "success")
         return redirect(url_for("view_student", student_id=new_id))
@@ -498,12 +755,17 @@ def edit_student(student_id):
             photo = fn
         updates = []
         params = []
-        fields = ["school_id","sl_no","student_name","father_name","mother_name","sex_cast","dob","aadhaar_no","mobile_no","admission_class","admission_no","blood_group","address","category","religion","prev_school","medical_issues","emergency_contact","status"]
+        fields = ["school_id","sl_no","student_name","father_name","mother_name","sex_cast","dob","aadhaar_no","mobile_no","admission_class","admission_no","section","blood_group","address","category","religion","prev_school","medical_issues","emergency_contact"]
+        if "status" in form:
+            # the edit form has no status field; leave the stored status alone unless one is sent
+            fields.append("status")
         for fld in fields:
             updates.append(f"{fld}=?")
             params.append(form.get(fld, ""))
         updates.append("transport_required=?")
         params.append(1 if form.get("transport_required") == "on" else 0)
+        updates.append("gender=?, class_key=?, mobile_digits=?, aadhaar_digits=?")
+        params += normalized_columns(form.get("sex_cast", ""), form.get("admission_class", ""), form.get("mobile_no", ""), form.get("aadhaar_no", ""))
         updates.append("updated_at=?")
         params.append(now_ts())
         if photo:
@@ -511,12 +773,16 @@ def edit_student(student_id):
         params.append(student_id)
         sql = "UPDATE students SET " + ",".join(updates) + " WHERE id=?"
         cur.execute(sql, params)
+        version = students_version(cur)
+        row = cur.execute("SELECT status FROM students WHERE id=?", (student_id,)).fetchone()
         remark_text = form.get("new_remark", "").strip()
         if remark_text:
             cur.execute("INSERT INTO remarks (student_id,author,role,text,created_at) VALUES (?,?,?,?,?)",
                         (student_id, current_user.username, current_user.role, remark_text, now_ts()))
         conn.commit()
         conn.close()
+        roster_index.apply(version, student_id, form.get("student_name", ""), form.get("admission_class", ""),
+                           row["status"] if row else "")
         record_audit(current_user.username, "UPDATE", student_id, f"Edited student {student_id}")
         flash("Student updated", "success")
         return redirect(url_for("view_student", student_id=student_id))
@@ -532,12 +798,133 @@ def delete_student(student_id):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute("DELETE FROM students WHERE id=?", (student_id,))
+    version = students_version(cur)
     conn.commit()
     conn.close()
+    roster_index.apply(version, student_id, deleted=True)
     record_audit(current_user.username, "DELETE", student_id, f"Deleted student {student_id}")
     flash("Student deleted", "info")
     return redirect(url_for("search"))
 
+# -------------------------
+# Bulk operations
+# -------------------------
+BULK_STATUSES = ("active", "inactive", "transferred")
+
+def compact_ids(ids):
+    """Collapse ids into a short range string for the audit log, e.g. '1-4,7,9-10'."""
+    parts = []
+    start = prev = None
+    for i in sorted(set(int(x) for x in ids)):
+        if start is not None and i == prev + 1:
+            prev = i
+            continue
+        if start is not None:
+            parts.append(str(start) if start == prev else f"{start}-{prev}")
+        start = prev = i
+    if start is not None:
+        parts.append(str(start) if start == prev else f"{start}-{prev}")
+    return ",".join(parts)
+
+def _load_bulk_selection(cur, ids):
+    # selected ids go through a temp table so the UPDATE stays one statement
+    # no matter how many students were ticked
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_selection (id INTEGER PRIMARY KEY)")
+    cur.execute("DELETE FROM bulk_selection")
+    cur.executemany("INSERT OR IGNORE INTO bulk_selection (id) VALUES (?)", [(int(i),) for i in ids])
+
+def run_bulk_operation(action, user, from_cls="", to_cls="", status="", section="", ids=(), dry_run=False):
+    """
+    Applies one bulk action ('promote', 'status' or 'section') in a single transaction
+    and writes one audit row for the whole batch.
+    Returns (rows, message) where rows are the students matched by the action.
+    With dry_run=True nothing is written.
+    """
+    if action == "promote":
+        if not from_cls or not to_cls:
+            raise ValueError("Both source and target class are required")
+        where, where_params = "class_key=? AND status='active'", [class_key(from_cls)]
+        set_sql, set_params = "admission_class=?, class_key=?", [to_cls, class_key(to_cls)]
+        summary = f"Promote class {from_cls} -> {to_cls}"
+    elif action == "status":
+        if status not in BULK_STATUSES:
+            raise ValueError(f"Unknown status '{status}'")
+        if not ids:
+            raise ValueError("No students selected")
+        where, where_params = "id IN (SELECT id FROM bulk_selection)", []
+        set_sql, set_params = "status=?", [status]
+        summary = f"Set status {status}"
+    elif action == "section":
+        if not ids:
+            raise ValueError("No students selected")
+        where, where_params = "id IN (SELECT id FROM bulk_selection)", []
+        set_sql, set_params = "section=?", [section]
+        summary = f"Assign section '{section}'"
+    else:
+        raise ValueError(f"Unknown bulk action '{action}'")
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        if not dry_run:
+            cur.execute("BEGIN IMMEDIATE")
+        if ids:
+            _load_bulk_selection(cur, ids)
+        cur.execute(f"SELECT id,student_name,admission_class,section,status FROM students WHERE {where} ORDER BY student_name COLLATE NOCASE",
+                    where_params)
+        rows = cur.fetchall()
+        if dry_run:
+            conn.rollback()
+            return rows, f"{summary}: {len(rows)} students would change (preview)"
+        if not rows:
+            conn.rollback()
+            return rows, f"{summary}: no matching students"
+        cur.execute(f"UPDATE students SET {set_sql}, updated_at=? WHERE {where}", set_params + [now_ts()] + where_params)
+        changed = cur.rowcount
+        cur.execute("INSERT INTO audit_log (user,action,student_id,change_summary,timestamp) VALUES (?,?,?,?,?)",
+                    (user, "BULK_" + action.upper(), None,
+                     f"{summary}: {changed} students [{compact_ids(r['id'] for r in rows)}]", now_ts()))
+        conn.commit()
+        return rows, f"{summary}: {changed} students updated"
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+@app.route("/bulk", methods=["GET", "POST"])
+@login_required
+def bulk_operations():
+    cls = request.values.get("cls", "").strip()
+    preview = None
+    if request.method == "POST":
+        form = request.form
+        dry_run = form.get("mode") == "preview"
+        try:
+            rows, msg = run_bulk_operation(
+                form.get("action", ""), current_user.username,
+                from_cls=cls, to_cls=form.get("to_cls", "").strip(),
+                status=form.get("status", ""), section=form.get("section", "").strip(),
+                ids=form.getlist("student_id"), dry_run=dry_run)
+        except ValueError as e:
+            flash("Bulk operation failed: " + str(e), "danger")
+            return redirect(url_for("bulk_operations", cls=cls))
+        if not dry_run:
+            flash(msg, "success")
+            return redirect(url_for("bulk_operations", cls=form.get("to_cls", "").strip() or cls))
+        preview = {"message": msg, "rows": rows, "form": form}
+    classes = roster_index.classes(include_inactive=True)
+    studs = []
+    if cls:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute("SELECT id,student_name,section,status FROM students WHERE class_key=? ORDER BY student_name COLLATE NOCASE",
+                    (class_key(cls),))
+        studs = cur.fetchall()
+        conn.close()
+    return render_template("bulk.html", cls=cls, cls_key=class_key(cls), classes=classes, students=studs,
+                           statuses=BULK_STATUSES, preview=preview)
+
 # -------------------------
 # Remarks API
 # -------------------------
@@ -564,17 +951,16 @@ def add_remark(student_id):
 @app.route("/attendance/<string:cls>", methods=["GET", "POST"])
 @login_required
 def attendance_view(cls):
+    studs = [{"id": sid, "student_name": name} for sid, name in roster_index.roster(cls)]
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("SELECT id,student_name FROM students WHERE admission_class=? ORDER BY student_name", (cls,))
-    studs = cur.fetchall()
     if request.method == "POST":
-        d = request.form.get("date", date.today().isoformat())
-        for sid in request.form.getlist("student_id"):
-            status = request.form.get(f"status_{sid}", "absent")
-            cur.execute("INSERT OR REPLACE INTO attendance (student_id,date,status,note) VALUES (?,?,?,?)",
-                        (sid, d, status, request.form.get(f"note_{sid}", "")))
+        d = request.form.get("date") or date.today().isoformat()
+        marks = [(s["id"], d, request.form[f"status_{s['id']}"], request.form.get(f"note_{s['id']}", ""))
+                 for s in studs if f"status_{s['id']}" in request.form]
+        cur.executemany("INSERT OR REPLACE INTO attendance (student_id,date,status,note) VALUES (?,?,?,?)", marks)
         conn.commit()
+        conn.close()
         flash("Attendance saved", "success")
         return redirect(url_for("attendance_view", cls=cls))
     cur.execute("SELECT date FROM attendance ORDER BY date DESC LIMIT 14")
@@ -643,20 +1029,78 @@ def backup_db():
         abort(404)
     return send_file(DB_PATH, as_attachment=True, download_name=f"students_backup_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}.db")
 
+# -------------------------
+# Batch reports
+# -------------------------
+def load_report_docs(cls=""):
+    """
+    Collects everything the roster and report cards need for one class
+    (or the whole school when cls is empty) in three set-based queries.
+    Returns plain dicts so they can be shipped to the report worker pool.
+    """
+    where, params = ("WHERE s.class_key=?", [class_key(cls)]) if cls else ("", [])
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(f"""SELECT s.id,s.admission_no,s.student_name,s.father_name,s.mother_name,s.dob,s.mobile_no,
+                          s.admission_class,s.class_key,s.section,s.gender,s.status
+                   FROM students s {where} ORDER BY s.class_key, s.student_name COLLATE NOCASE""", params)
+    students = [dict(r) for r in cur.fetchall()]
+    cur.execute(f"""SELECT a.student_id, a.status, COUNT(*) AS days
+                   FROM attendance a JOIN students s ON s.id = a.student_id {where}
+                   GROUP BY a.student_id, a.status""", params)
+    attendance = {}
+    for r in cur.fetchall():
+        attendance.setdefault(r["student_id"], {})[r["status"]] = r["days"]
+    cur.execute(f"""SELECT f.student_id,f.year,f.month,f.amount,f.paid,f.paid_on
+                   FROM fees f JOIN students s ON s.id = f.student_id {where}
+                   ORDER BY f.student_id, f.year DESC, f.month DESC""", params)
+    fees = {}
+    for r in cur.fetchall():
+        fees.setdefault(r["student_id"], []).append(dict(r))
+    conn.close()
+    generated_on = now_ts()
+    return [{"student": st, "attendance": attendance.get(st["id"], {}), "fees": fees.get(st["id"], []),
+             "generated_on": generated_on} for st in students]
+
+@app.route("/reports")
+@login_required
+def batch_reports():
+    cls = request.args.get("cls", "").strip()
+    roster_format = "xlsx" if request.args.get("roster") == "xlsx" else "csv"
+    # an unknown or empty class is answered from the roster index without touching the tables
+    docs = load_report_docs(cls) if not cls or roster_index.roster(cls) else []
+    if not docs:
+        flash("No students found for reports", "warning")
+        return redirect(request.referrer or url_for("dashboard"))
+    name = secure_filename(f"reports_{cls or 'all'}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}.zip")
+    return Response(reports.iter_report_zip(cls or "all", docs, roster_format), mimetype="application/zip",
+                    headers={"Content-Disposition": f"attachment; filename={name}"})
+
 # -------------------------
 # Duplicates
 # -------------------------
 @app.route("/duplicates")
 @login_required
 def find_duplicates():
+    return delivery.conditional_page(("duplicates", students_version(), current_user.id), _render_duplicates)
+
+def _render_duplicates():
     conn = get_conn()
     cur = conn.cursor()
+    # one indexed equality join per heuristic; UNION drops pairs matched twice
     cur.execute("""
     SELECT a.id as id1, b.id as id2, a.student_name as name1, b.student_name as name2, a.aadhaar_no as aad1, b.aadhaar_no as aad2
-    FROM students a JOIN students b ON a.id < b.id
-    WHERE (a.aadhaar_no != '' AND a.aadhaar_no = b.aadhaar_no)
-       OR (a.mobile_no != '' AND a.mobile_no = b.mobile_no)
-       OR (lower(a.student_name) = lower(b.student_name) AND a.dob = b.dob)
+    FROM students a JOIN students b ON b.aadhaar_digits = a.aadhaar_digits AND a.id < b.id
+    WHERE a.aadhaar_digits != ''
+    UNION
+    SELECT a.id, b.id, a.student_name, b.student_name, a.aadhaar_no, b.aadhaar_no
+    FROM students a JOIN students b ON b.mobile_digits = a.mobile_digits AND a.id < b.id
+    WHERE a.mobile_digits != ''
+    UNION
+    SELECT a.id, b.id, a.student_name, b.student_name, a.aadhaar_no, b.aadhaar_no
+    FROM students a JOIN students b ON b.dob = a.dob AND a.id < b.id
+    WHERE lower(a.student_name) = lower(b.student_name)
+    ORDER BY id1, id2
     """)
     dup = cur.fetchall()
     conn.close()
@@ -0,0 +1,73 @@
+# bench_reports.py - Timing check for batch report generation
+#
+# Seeds a throwaway database with a 1,500-student school (12 classes,
+# 120 days of attendance and 12 fee months per student) and times a full
+# school report archive: the set-based data load plus the streamed zip.
+#
+#   python bench_reports.py [students]
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+CLASSES = 12
+ATTENDANCE_DAYS = 120
+FEE_MONTHS = 12
+TARGET_SECONDS = 5.0  # whole-school archive for 1,500 students
+
+def seed(app):
+    conn = app.get_conn()
+    cur = conn.cursor()
+    now = app.now_ts()
+    rng = random.Random(42)
+    students = []
+    for i in range(STUDENTS):
+        cls = str(i % CLASSES + 1)
+        sex = rng.choice(["M / GEN", "F / OBC"])
+        mobile = f"9{rng.randrange(10**8, 10**9)}"
+        students.append((app.stable_id("BENCH", str(i)), "BENCH", str(i), f"Student {i}", f"Father {i}", f"Mother {i}",
+                         sex, "2012-01-01", mobile, cls, str(i), "active",
+                         *app.normalized_columns(sex, cls, mobile, ""), now, now))
+    cur.executemany("""INSERT INTO students (
+        stable_id, school_id, sl_no, student_name, father_name, mother_name, sex_cast, dob, mobile_no,
+        admission_class, admission_no, status, gender, class_key, mobile_digits, aadhaar_digits, created_at, updated_at
+    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""", students)
+    ids = [r[0] for r in cur.execute("SELECT id FROM students")]
+    cur.executemany("INSERT INTO attendance (student_id,date,status,note) VALUES (?,?,?,'')",
+                    ((sid, f"2024-{d // 28 + 1:02d}-{d % 28 + 1:02d}", "present" if rng.random() < 0.9 else "absent")
+                     for sid in ids for d in range(ATTENDANCE_DAYS)))
+    cur.executemany("INSERT INTO fees (student_id,year,month,amount,paid,note) VALUES (?,?,?,?,?,'')",
+                    ((sid, 2024, m, 500.0, int(m < 9)) for sid in ids for m in range(1, FEE_MONTHS + 1)))
+    conn.commit()
+    conn.close()
+
+def main():
+    tmp = tempfile.mkdtemp()
+    os.environ["ERP_DB_PATH"] = os.path.join(tmp, "bench.db")
+    try:
+        return run()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def run():
+    import app
+    import reports
+
+    seed(app)
+    start = time.perf_counter()
+    docs = app.load_report_docs()
+    loaded = time.perf_counter()
+    size = sum(len(chunk) for chunk in reports.iter_report_zip("all", docs))
+    done = time.perf_counter()
+
+    print(f"students={len(docs)} workers={reports.REPORT_WORKERS}")
+    print(f"load={loaded - start:.2f}s render+zip={done - loaded:.2f}s total={done - start:.2f}s zip={size / 1024:.0f}KB")
+    ok = done - start <= TARGET_SECONDS
+    print(f"target {TARGET_SECONDS:.0f}s: {'PASS' if ok else 'FAIL'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# delivery.py - Static asset fingerprinting, response compression and conditional GET
+#
+# Everything here is about bytes on the wire: content-hashed asset URLs that
+# browsers may cache for a year, gzip/brotli for larger HTML/JSON responses,
+# and weak ETags so unchanged list pages come back as a bare 304.
+import os
+import gzip
+import hashlib
+import mimetypes
+from flask import request, session, make_response, url_for, abort, Response, current_app
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = {"text/html", "application/json", "text/css", "text/javascript", "application/javascript"}
+
+_fingerprints = {}        # path -> (mtime, digest)
+_compressed_assets = {}   # (path, digest, encoding) -> bytes
+_build_ids = {}           # app name -> hash of templates and static files
+
+def fingerprint(static_folder, path):
+    """Short content hash of a static file, recomputed only when the file changes."""
+    full = os.path.join(static_folder, path)
+    mtime = os.path.getmtime(full)
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(full, "rb") as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()[:10]
+    _fingerprints[path] = (mtime, digest)
+    return digest
+
+def _hashed_name(path, digest):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+def _split_hashed(filename):
+    # 'css/main.3f2a1b9c0d.css' -> ('css/main.css', '3f2a1b9c0d')
+    root, ext = os.path.splitext(filename)
+    base, _, digest = root.rpartition(".")
+    if not base:
+        return filename, ""
+    return base + ext, digest
+
+def _build_id(app):
+    # changes whenever a template or static file changes, and is the same in every worker;
+    # computed on first use so importing the app stays cheap
+    if app.name in _build_ids:
+        return _build_ids[app.name]
+    h = hashlib.sha256()
+    for folder in (app.template_folder and os.path.join(app.root_path, app.template_folder), app.static_folder):
+        if not folder:
+            continue
+        for dirpath, _, files in sorted(os.walk(folder)):
+            for name in sorted(files):
+                with open(os.path.join(dirpath, name), "rb") as fh:
+                    h.update(name.encode())
+                    h.update(fh.read())
+    _build_ids[app.name] = h.hexdigest()[:12]
+    return _build_ids[app.name]
+
+def _preferred_encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept["br"]:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+def _compress(data, encoding, static=False):
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if static else 5)
+    return gzip.compress(data, compresslevel=9 if static else 6)
+
+def conditional_page(etag_parts, render):
+    """
+    Serves a list page with a weak ETag built from etag_parts (data version,
+    user, query string...). Returns a bare 304 when the client's copy is current;
+    otherwise calls render() for the body. Pages with pending flash messages are
+    always rendered, since the flash is part of the page.
+    """
+    parts = (_build_id(current_app),) + tuple(etag_parts)
+    etag = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    if "_flashes" not in session and request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = make_response(render())
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+def init_app(app):
+    def asset_url(path):
+        return url_for("asset", filename=_hashed_name(path, fingerprint(app.static_folder, path)))
+
+    app.jinja_env.globals["asset_url"] = asset_url
+
+    @app.route("/assets/<path:filename>")
+    def asset(filename):
+        path, digest = _split_hashed(filename)
+        full = safe_join(app.static_folder, path)
+        if full is None or not os.path.isfile(full):
+            abort(404)
+        current = fingerprint(app.static_folder, path)
+        encoding = _preferred_encoding()
+        # each encoding is a different byte sequence, so each gets its own strong ETag
+        etag = f"{current}-{encoding or 'identity'}"
+        if request.if_none_match.contains(etag):
+            resp = Response(status=304)
+        else:
+            key = (path, current, encoding)
+            data = _compressed_assets.get(key)
+            if data is None:
+                with open(full, "rb") as fh:
+                    data = fh.read()
+                if encoding:
+                    data = _compress(data, encoding, static=True)
+                _compressed_assets[key] = data
+            resp = Response(data, mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream")
+            if encoding:
+                resp.headers["Content-Encoding"] = encoding
+        resp.set_etag(etag)
+        resp.vary.add("Accept-Encoding")
+        if digest == current:
+            resp.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+        else:
+            # stale hash from an old page: serve the current file but don't pin it
+            resp.headers["Cache-Control"] = "public, no-cache"
+        return resp
+
+    @app.after_request
+    def compress_response(resp):
+        if (resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed
+                or "Content-Encoding" in resp.headers or resp.mimetype not in COMPRESSIBLE_TYPES):
+            return resp
+        data = resp.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return resp
+        encoding = _preferred_encoding()
+        resp.vary.add("Accept-Encoding")
+        if encoding:
+            resp.set_data(_compress(data, encoding))
+            resp.headers["Content-Encoding"] = encoding
+        return resp
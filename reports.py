@@ -0,0 +1,153 @@
+# reports.py - Batch class rosters and report cards
+#
+# Kept apart from app.py: everything here works on plain dicts so report
+# cards can be rendered in a process pool without touching Flask or SQLite.
+import os
+import io
+import re
+import csv
+import zipfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", os.cpu_count() or 2))
+# below this many students the pool start-up costs more than it saves
+POOL_THRESHOLD = 50
+CHUNK_SIZE = 32
+
+ROSTER_COLUMNS = ["sl", "admission_class", "admission_no", "student_name", "father_name", "section", "gender",
+                  "mobile_no", "status", "days_present", "days_marked", "attendance_pct", "fees_due"]
+
+_env = None
+_pool = None
+_pool_lock = threading.Lock()
+
+def _template(name):
+    global _env
+    if _env is None:
+        _env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape(["html"]))
+    return _env.get_template(name)
+
+def get_pool():
+    """Shared worker pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+        return _pool
+
+def discard_pool(pool):
+    """Drops a broken pool so the next get_pool() starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _render_all(docs):
+    # results come back in order, so after a worker dies the cards not yet
+    # written are rendered in this process instead of failing the download
+    if len(docs) < POOL_THRESHOLD:
+        yield from map(render_report_card, docs)
+        return
+    pool = get_pool()
+    done = 0
+    try:
+        for item in pool.map(render_report_card, docs, chunksize=CHUNK_SIZE):
+            yield item
+            done += 1
+    except BrokenProcessPool:
+        discard_pool(pool)
+        yield from map(render_report_card, docs[done:])
+
+def _slug(text, default="student"):
+    return re.sub(r"[^A-Za-z0-9]+", "_", text or "").strip("_") or default
+
+def summarize(attendance, fees):
+    """Attendance and fee totals shared by the roster and the report card."""
+    present = attendance.get("present", 0)
+    marked = sum(attendance.values())
+    due = sum(f["amount"] or 0 for f in fees if not f["paid"])
+    paid = sum(f["amount"] or 0 for f in fees if f["paid"])
+    return {
+        "days_present": present,
+        "days_marked": marked,
+        "attendance_pct": round(100.0 * present / marked, 1) if marked else "",
+        "fees_due": due,
+        "fees_paid": paid,
+    }
+
+def render_report_card(doc):
+    """
+    Renders one student's report card. Runs inside a pool worker, so doc holds
+    plain dicts: {"student", "attendance" (status -> days), "fees", "generated_on"}.
+    Returns (archive path, html bytes).
+    """
+    s = doc["student"]
+    totals = summarize(doc["attendance"], doc["fees"])
+    html = _template("report_card.html").render(student=s, fees=doc["fees"], totals=totals,
+                                                generated_on=doc["generated_on"])
+    name = (f"report_cards/{_slug(s['class_key'], 'unassigned')}/"
+            f"{_slug(s['admission_no'] or str(s['id']))}_{_slug(s['student_name'])}.html")
+    return name, html.encode("utf-8")
+
+def roster_csv(docs):
+    si = io.StringIO()
+    cw = csv.writer(si)
+    cw.writerow(ROSTER_COLUMNS)
+    for n, doc in enumerate(docs, 1):
+        row = dict(doc["student"], sl=n, **summarize(doc["attendance"], doc["fees"]))
+        cw.writerow([row.get(c, "") for c in ROSTER_COLUMNS])
+    return si.getvalue().encode("utf-8")
+
+def roster_xlsx(docs, cls):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=_slug(cls)[:31])
+    ws.append(ROSTER_COLUMNS)
+    for n, doc in enumerate(docs, 1):
+        row = dict(doc["student"], sl=n, **summarize(doc["attendance"], doc["fees"]))
+        ws.append([row.get(c, "") for c in ROSTER_COLUMNS])
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink for ZipFile that hands back whatever was written since the last drain."""
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_report_zip(cls, docs, roster_format="csv"):
+    """
+    Yields a zip archive (roster + one report card per student) chunk by chunk.
+    Report cards are rendered across the process pool for larger classes.
+    """
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if roster_format == "xlsx":
+            zf.writestr(f"roster_{_slug(cls)}.xlsx", roster_xlsx(docs, cls))
+        else:
+            zf.writestr(f"roster_{_slug(cls)}.csv", roster_csv(docs))
+        yield sink.drain()
+
+        for name, data in _render_all(docs):
+            zf.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# app.py opens its database on import; keep the tests away from students_erp.db
+os.environ.setdefault("ERP_DB_PATH", os.path.join(tempfile.mkdtemp(), "test_erp.db"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
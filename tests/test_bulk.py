@@ -0,0 +1,99 @@
+import pytest
+
+import app
+
+
+def add_students(cls, n, status="active"):
+    conn = app.get_conn()
+    cur = conn.cursor()
+    ids = []
+    for i in range(n):
+        cur.execute("INSERT INTO students (student_name,admission_class,class_key,status) VALUES (?,?,?,?)",
+                    (f"{cls} student {i}", cls, app.class_key(cls), status))
+        ids.append(cur.lastrowid)
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def bulk_audit_rows():
+    conn = app.get_conn()
+    rows = conn.execute("SELECT action,change_summary FROM audit_log WHERE action LIKE 'BULK_%' ORDER BY id").fetchall()
+    conn.close()
+    return [tuple(r) for r in rows]
+
+
+def student(student_id):
+    conn = app.get_conn()
+    r = conn.execute("SELECT admission_class,class_key,section,status FROM students WHERE id=?", (student_id,)).fetchone()
+    conn.close()
+    return tuple(r)
+
+
+@pytest.mark.parametrize("ids, compact", [
+    ([], ""),
+    ([7], "7"),
+    ([3, 1, 2, 4], "1-4"),
+    ([1, 2, 3, 4, 7, 9, 10], "1-4,7,9-10"),
+    (["5", 5, "6"], "5-6"),
+])
+def test_compact_ids(ids, compact):
+    assert app.compact_ids(ids) == compact
+
+
+def test_promote_preview_writes_nothing():
+    ids = add_students("Class XI", 3)
+    before = bulk_audit_rows()
+    rows, msg = app.run_bulk_operation("promote", "tester", from_cls="XI", to_cls="XII", dry_run=True)
+    assert sorted(r["id"] for r in rows) == ids
+    assert "preview" in msg
+    assert all(student(i)[1] == "11" for i in ids)
+    assert bulk_audit_rows() == before
+
+
+def test_promote_moves_active_students_with_one_audit_row():
+    ids = add_students("IX", 3)
+    left = add_students("IX", 1, status="transferred")
+    before = bulk_audit_rows()
+    rows, msg = app.run_bulk_operation("promote", "tester", from_cls="9th", to_cls="X")
+    assert msg.endswith("3 students updated")
+    assert [student(i)[:2] for i in ids] == [("X", "10")] * 3
+    assert student(left[0])[:2] == ("IX", "9")
+    new = bulk_audit_rows()[len(before):]
+    assert new == [("BULK_PROMOTE", f"Promote class 9th -> X: 3 students [{ids[0]}-{ids[-1]}]")]
+
+
+def test_status_and_section_on_selection():
+    ids = add_students("LKG", 5)
+    picked = [ids[0], ids[1], ids[3]]
+    before = bulk_audit_rows()
+    app.run_bulk_operation("status", "tester", status="transferred", ids=[str(i) for i in picked])
+    app.run_bulk_operation("section", "tester", section="B", ids=picked[:2])
+    assert [student(i)[3] for i in ids] == ["transferred", "transferred", "active", "transferred", "active"]
+    assert [student(i)[2] for i in ids] == ["B", "B", "", "", ""]
+    new = bulk_audit_rows()[len(before):]
+    assert new == [
+        ("BULK_STATUS", f"Set status transferred: 3 students [{ids[0]}-{ids[1]},{ids[3]}]"),
+        ("BULK_SECTION", f"Assign section 'B': 2 students [{ids[0]}-{ids[1]}]"),
+    ]
+
+
+def test_empty_source_class():
+    before = bulk_audit_rows()
+    rows, msg = app.run_bulk_operation("promote", "tester", from_cls="UKG", to_cls="I")
+    assert rows == []
+    assert msg.endswith("no matching students")
+    assert bulk_audit_rows() == before
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"action": "promote", "from_cls": "5"},
+    {"action": "status", "status": "expelled", "ids": [1]},
+    {"action": "status", "status": "inactive"},
+    {"action": "section", "section": "A"},
+    {"action": "delete"},
+])
+def test_invalid_requests(kwargs):
+    action = kwargs.pop("action")
+    with pytest.raises(ValueError):
+        app.run_bulk_operation(action, "tester", **kwargs)
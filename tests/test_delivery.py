@@ -0,0 +1,41 @@
+import gzip
+
+import app
+
+CSS = "vendor/bootstrap-5.3.8/bootstrap.min.css"
+
+
+def asset_path():
+    with app.app.test_request_context():
+        return app.app.jinja_env.globals["asset_url"](CSS)
+
+
+def test_asset_etag_is_specific_to_the_encoding():
+    client = app.app.test_client()
+    url = asset_path()
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    zipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert plain.headers.get("Content-Encoding") is None
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == plain.data
+    assert plain.get_etag()[0] != zipped.get_etag()[0]
+    assert "immutable" in zipped.headers["Cache-Control"]
+
+
+def test_asset_revalidates_only_against_the_same_encoding():
+    client = app.app.test_client()
+    url = asset_path()
+    zipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    etag = zipped.headers["ETag"]
+
+    same = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    other = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+
+    assert same.status_code == 304
+    assert other.status_code == 200
+    assert other.headers.get("Content-Encoding") is None
+
+
+def test_unknown_asset_is_404():
+    assert app.app.test_client().get("/assets/css/missing.0123456789.css").status_code == 404
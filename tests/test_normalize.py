@@ -0,0 +1,52 @@
+import pytest
+
+from app import class_key, gender_of, mobile_digits, aadhaar_digits
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("5", "5"),
+    ("05", "5"),
+    ("5th", "5"),
+    ("5 th", "5"),
+    ("5TH", "5"),
+    ("V", "5"),
+    ("Vth", "5"),
+    ("IXth", "9"),
+    ("VIII", "8"),
+    ("XII", "12"),
+    ("Class V", "5"),
+    ("Std 10th", "10"),
+    ("V-A", "5A"),
+    ("VA", "5A"),
+    ("5A", "5A"),
+    ("5th B", "5B"),
+    ("LKG", "LKG"),
+    ("", ""),
+    (None, ""),
+])
+def test_class_key(raw, key):
+    assert class_key(raw) == key
+
+
+@pytest.mark.parametrize("raw", ["5 th", "Vth", "V-A", "IXth", "Class XII", "LKG"])
+def test_class_key_is_stable_on_keys(raw):
+    assert class_key(class_key(raw)) == class_key(raw)
+
+
+@pytest.mark.parametrize("raw, gender", [
+    ("M / OBC", "M"),
+    ("Male/GEN", "M"),
+    ("f / sc", "F"),
+    ("Female", "F"),
+    ("GEN", ""),
+    ("", ""),
+    (None, ""),
+])
+def test_gender_of(raw, gender):
+    assert gender_of(raw) == gender
+
+
+def test_digit_columns():
+    assert mobile_digits("+91 98765-43210") == "9876543210"
+    assert mobile_digits("098765 43210") == "9876543210"
+    assert aadhaar_digits("1234 5678-9012") == "123456789012"
@@ -0,0 +1,42 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import reports
+
+
+def doc(i):
+    return {"student": {"id": i, "student_name": f"Student {i}", "admission_no": str(i), "class_key": "5",
+                        "admission_class": "5", "father_name": "", "mother_name": "", "section": "", "gender": "",
+                        "mobile_no": "", "status": "active", "dob": ""},
+            "attendance": {"present": 3, "absent": 1}, "fees": [], "generated_on": "2024-01-01"}
+
+
+class DyingPool:
+    """Stands in for a pool whose worker is killed after a few results."""
+    def __init__(self, survive):
+        self.survive = survive
+        self.shut_down = False
+
+    def map(self, fn, docs, chunksize=1):
+        for d in docs[:self.survive]:
+            yield fn(d)
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_falls_back_and_is_replaced(monkeypatch):
+    docs = [doc(i) for i in range(reports.POOL_THRESHOLD)]
+    dying = DyingPool(survive=7)
+    monkeypatch.setattr(reports, "_pool", dying)
+
+    names = [name for name, _ in reports._render_all(docs)]
+
+    assert names == [reports.render_report_card(d)[0] for d in docs]
+    assert dying.shut_down
+    assert reports._pool is None
+
+
+def test_small_batches_skip_the_pool(monkeypatch):
+    monkeypatch.setattr(reports, "get_pool", lambda: (_ for _ in ()).throw(AssertionError("pool used")))
+    assert len(list(reports._render_all([doc(1), doc(2)]))) == 2
@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+import app
+
+
+def write(sql, params=()):
+    """Runs one students write the way the views do and returns (version, lastrowid)."""
+    conn = app.get_conn()
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    version = app.students_version(cur)
+    conn.commit()
+    conn.close()
+    return version, cur.lastrowid
+
+
+def insert(name, cls, status="active"):
+    return write("INSERT INTO students (student_name,admission_class,class_key,status) VALUES (?,?,?,?)",
+                 (name, cls, app.class_key(cls), status))
+
+
+def counts(index):
+    return {key: (label, n) for key, label, n in index.classes(include_inactive=True)}
+
+
+@pytest.fixture
+def index():
+    idx = app.ClassRosterIndex()
+    idx.classes()  # build once
+    return idx
+
+
+@pytest.fixture
+def no_rebuild(index, monkeypatch):
+    def fail(cur):
+        raise AssertionError("index was rebuilt")
+    monkeypatch.setattr(index, "_rebuild", fail)
+    return index
+
+
+def test_add_edit_delete_apply_in_place(index, no_rebuild):
+    version, sid = insert("Zara Roster", "Class 31")
+    index.apply(version, sid, "Zara Roster", "Class 31")
+    version, other = insert("Adil Roster", "31")
+    index.apply(version, other, "Adil Roster", "31")
+    assert index.roster("Class 31") == [(other, "Adil Roster"), (sid, "Zara Roster")]
+    assert counts(index)["31"][1] == 2
+
+    version, _ = write("UPDATE students SET admission_class='32',class_key='32' WHERE id=?", (sid,))
+    index.apply(version, sid, "Zara Roster", "32")
+    assert index.roster("31") == [(other, "Adil Roster")]
+    assert index.roster("32") == [(sid, "Zara Roster")]
+    assert counts(index)["32"] == ("32", 1)
+
+    version, _ = write("DELETE FROM students WHERE id=?", (sid,))
+    index.apply(version, sid, deleted=True)
+    assert index.roster("32") == []
+    assert "32" not in counts(index)
+    assert counts(index)["31"] == ("31", 1)
+
+
+def test_write_from_another_connection_rebuilds(index):
+    conn = sqlite3.connect(app.DB_PATH)
+    conn.execute("INSERT INTO students (student_name,admission_class,class_key,status) VALUES ('Outside Roster','33','33','active')")
+    conn.commit()
+    conn.close()
+    assert [name for _, name in index.roster("33")] == ["Outside Roster"]
+    assert index._version == app.students_version()
+
+
+def test_noop_delete_invalidates_without_corrupting(index):
+    version, sid = insert("Kept Roster", "34")
+    index.apply(version, sid, "Kept Roster", "34")
+    version, _ = write("DELETE FROM students WHERE id=?", (10 ** 9,))
+    index.apply(version, 10 ** 9, deleted=True)
+    assert index._version is None
+    assert index.roster("34") == [(sid, "Kept Roster")]
+    assert index._version == app.students_version()
+
+
+def test_only_active_students_are_listed(index, no_rebuild):
+    version, active = insert("Active Roster", "35")
+    index.apply(version, active, "Active Roster", "35")
+    version, moved = insert("Moved Roster", "35", "transferred")
+    index.apply(version, moved, "Moved Roster", "35", "transferred")
+    assert index.roster("35") == [(active, "Active Roster")]
+    assert counts(index)["35"] == ("35", 1)
+
+    version, _ = write("UPDATE students SET status='inactive' WHERE id=?", (active,))
+    index.apply(version, active, "Active Roster", "35", "inactive")
+    assert index.roster("35") == []
+    assert "35" not in {key for key, _, _ in index.classes()}
+    assert counts(index)["35"] == ("35", 0)
+
+
+def test_rebuild_skips_inactive_students():
+    insert("Gone Roster", "36", "inactive")
+    insert("Here Roster", "36")
+    assert [name for _, name in app.ClassRosterIndex().roster("36")] == ["Here Roster"]
+
+
+def test_edit_without_status_field_keeps_status():
+    _, sid = insert("Edited Roster", "37", "transferred")
+    client = app.app.test_client()
+    client.post("/login", data={"username": "admin", "password": "admin123"})
+    client.post(f"/student/{sid}/edit", data={"student_name": "Edited Roster", "admission_class": "37"})
+    conn = app.get_conn()
+    assert conn.execute("SELECT status FROM students WHERE id=?", (sid,)).fetchone()[0] == "transferred"
+    conn.close()
+    assert app.roster_index.roster("37") == []
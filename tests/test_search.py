@@ -0,0 +1,39 @@
+import pytest
+
+import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    conn = app.get_conn()
+    for name, mobile, aadhaar in [("Search Mobile", "98765-43210", ""),
+                                  ("Search Aadhaar", "", "1234 5678 9012"),
+                                  ("Search Blank", "", "")]:
+        conn.execute("INSERT INTO students (student_name,mobile_no,aadhaar_no,mobile_digits,aadhaar_digits) VALUES (?,?,?,?,?)",
+                     (name, mobile, aadhaar, app.mobile_digits(mobile), app.aadhaar_digits(aadhaar)))
+    conn.commit()
+    conn.close()
+    c = app.app.test_client()
+    c.post("/login", data={"username": "admin", "password": "admin123"})
+    return c
+
+
+def names(client, q):
+    html = client.get("/search", query_string={"q": q}).get_data(as_text=True)
+    return {n for n in ("Search Mobile", "Search Aadhaar", "Search Blank") if n in html}
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("9876543210", {"Search Mobile"}),
+    ("+91 98765 43210", {"Search Mobile"}),
+    ("123456789012", {"Search Aadhaar"}),
+    ("1234-5678-9012", {"Search Aadhaar"}),
+])
+def test_number_search_matches_digit_columns(client, q, expected):
+    assert names(client, q) == expected
+
+
+@pytest.mark.parametrize("q", ["-", "+", " - ", "98765"])
+def test_partial_or_empty_numbers_do_not_match_blank_columns(client, q):
+    assert "Search Blank" not in names(client, q)
+    assert "Search Aadhaar" not in names(client, q)